@@ -5,9 +5,12 @@ This module provides the structured data for the Risk Management Framework (RMF)
 tracking system, including all 7 stages and their associated tasks and artifacts.
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+from collections import Counter
 from datetime import datetime
 
+import orjson
+
 # RMF Stage definitions with checklists and artifacts
 RMF_STAGES = {
     "prepare": {
@@ -453,10 +456,42 @@ RMF_STAGES = {
     }
 }
 
+# (stage_id, task_id) -> task lookup so status updates don't scan checklists
+_TASK_INDEX: Dict[Tuple[str, str], Dict[str, Any]] = {
+    (stage_id, task['id']): task
+    for stage_id, stage in RMF_STAGES.items()
+    for task in stage['checklist']
+}
+
+# Estimated hours never change after import, so total them once
+_STAGE_HOURS: Dict[str, int] = {
+    stage_id: sum(task['estimated_hours'] for task in stage['checklist'])
+    for stage_id, stage in RMF_STAGES.items()
+}
+_TOTAL_HOURS = sum(_STAGE_HOURS.values())
+
+# Cached derived views of RMF_STAGES, rebuilt only after task state changes
+_summary_cache: Optional[Dict[str, Any]] = None
+_summary_dirty = True
+_stages_json_cache: Optional[bytes] = None
+
+def invalidate_rmf_state_caches() -> None:
+    """Mark the cached progress summary and stages JSON stale after task state changes"""
+    global _summary_dirty, _stages_json_cache
+    _summary_dirty = True
+    _stages_json_cache = None
+
 def get_all_rmf_stages() -> Dict[str, Any]:
     """Get all RMF stages with their checklists"""
     return RMF_STAGES
 
+def get_all_rmf_stages_json() -> bytes:
+    """Get all RMF stages pre-encoded as JSON"""
+    global _stages_json_cache
+    if _stages_json_cache is None:
+        _stages_json_cache = orjson.dumps(RMF_STAGES)
+    return _stages_json_cache
+
 def get_rmf_stage(stage_id: str) -> Dict[str, Any]:
     """Get a specific RMF stage by ID"""
     return RMF_STAGES.get(stage_id)
@@ -466,76 +501,96 @@ def get_rmf_stage_checklist(stage_id: str) -> List[Dict[str, Any]]:
     stage = RMF_STAGES.get(stage_id)
     return stage.get('checklist', []) if stage else []
 
+def get_rmf_total_hours() -> int:
+    """Get the total estimated hours across all RMF tasks"""
+    return _TOTAL_HOURS
+
 def get_rmf_progress_summary() -> Dict[str, Any]:
     """Calculate overall RMF progress summary"""
+    global _summary_cache, _summary_dirty
+    if not _summary_dirty:
+        return _copy_summary(_summary_cache)
+    
     total_tasks = 0
     completed_tasks = 0
+    stages_summary = {}
     
-    for stage in RMF_STAGES.values():
-        stage_tasks = len(stage['checklist'])
-        stage_completed = sum(1 for task in stage['checklist'] if task['status'] == 'completed')
+    # Single pass per stage: the per-stage counts feed both the stage
+    # summary and the overall totals
+    for stage_id, stage in RMF_STAGES.items():
+        checklist = stage['checklist']
+        stage_tasks = len(checklist)
+        status_counts = Counter(task['status'] for task in checklist)
+        stage_completed = status_counts['completed']
         
         total_tasks += stage_tasks
         completed_tasks += stage_completed
+        
+        stages_summary[stage_id] = {
+            'name': stage['name'],
+            'total_tasks': stage_tasks,
+            'completed_tasks': stage_completed,
+            'completion_percentage': round(
+                (stage_completed / stage_tasks * 100) if stage_tasks else 0, 1
+            )
+        }
     
     completion_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
     
-    return {
+    _summary_cache = {
         'total_stages': len(RMF_STAGES),
         'total_tasks': total_tasks,
         'completed_tasks': completed_tasks,
         'completion_percentage': round(completion_percentage, 1),
-        'stages_summary': {
-            stage_id: {
-                'name': stage['name'],
-                'total_tasks': len(stage['checklist']),
-                'completed_tasks': sum(1 for task in stage['checklist'] if task['status'] == 'completed'),
-                'completion_percentage': round(
-                    (sum(1 for task in stage['checklist'] if task['status'] == 'completed') / 
-                     len(stage['checklist']) * 100) if stage['checklist'] else 0, 1
-                )
-            }
-            for stage_id, stage in RMF_STAGES.items()
-        }
+        'stages_summary': stages_summary
+    }
+    _summary_dirty = False
+    return _copy_summary(_summary_cache)
+
+def _copy_summary(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the cached summary so callers can't modify the shared cache"""
+    return {
+        **summary,
+        'stages_summary': {stage_id: dict(stage) for stage_id, stage in summary['stages_summary'].items()}
     }
 
 def update_task_status(stage_id: str, task_id: str, status: str, notes: str = "", artifact_info: Dict[str, Any] = None) -> bool:
     """Update the status of a specific task"""
-    if stage_id not in RMF_STAGES:
+    if status not in RMF_TASK_STATUS_SET:
         return False
     
-    stage = RMF_STAGES[stage_id]
-    for task in stage['checklist']:
-        if task['id'] == task_id:
-            task['status'] = status
-            task['last_updated'] = datetime.now().isoformat()
-            if notes:
-                task['notes'] = notes
-            if artifact_info:
-                task['artifact_info'] = artifact_info
-            return True
+    task = _TASK_INDEX.get((stage_id, task_id))
+    if task is None:
+        return False
     
-    return False
+    task['status'] = status
+    task['last_updated'] = datetime.now().isoformat()
+    if notes:
+        task['notes'] = notes
+    if artifact_info:
+        task['artifact_info'] = artifact_info
+    invalidate_rmf_state_caches()
+    return True
 
 # Status options for RMF tasks
-RMF_TASK_STATUSES = [
+RMF_TASK_STATUSES = (
     'not_started',
     'in_progress', 
     'completed',
     'blocked',
     'deferred'
-]
+)
 
 # Priority levels
-RMF_TASK_PRIORITIES = [
+RMF_TASK_PRIORITIES = (
     'low',
     'medium',
     'high',
     'critical'
-]
+)
 
 # Artifact types
-RMF_ARTIFACT_TYPES = [
+RMF_ARTIFACT_TYPES = (
     'document',
     'spreadsheet',
     'diagram',
@@ -546,4 +601,7 @@ RMF_ARTIFACT_TYPES = [
     'package',
     'signature',
     'log'
-] 
\ No newline at end of file
+)
+
+# Set view used to validate status updates
+RMF_TASK_STATUS_SET = frozenset(RMF_TASK_STATUSES)
@@ -7,7 +7,7 @@ It provides endpoints for retrieving individual controls and searching across co
 
 from typing import List, Dict, Optional
 from fastapi import APIRouter, HTTPException, Query, Request, Body
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import json
 from pathlib import Path
 from data.controls import Control, get_control_by_id, search_controls, get_all_controls
@@ -157,7 +157,7 @@ async def get_all_controls_endpoint():
     """
     # Use cached version for better performance
     controls = get_full_controls_cached()
-    return JSONResponse(content=controls)
+    return ORJSONResponse(content=controls)
 
 
 @router.get("/controls/paginated")
@@ -234,7 +234,7 @@ async def get_controls_paginated(
     end_idx = start_idx + page_size
     page_controls = filtered_controls[start_idx:end_idx]
 
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "controls": page_controls,
         "pagination": {
             "page": page,
@@ -328,7 +328,7 @@ async def get_full_controls():
                 # If dict keyed by control_id, convert to list
                 if isinstance(data, dict):
                     data = list(data.values())
-                return JSONResponse(content=data)
+                return ORJSONResponse(content=data)
             except Exception as e:
                 return JSONResponse(status_code=500, content={"error": f"Failed to read {candidate.name}: {e}"})
 
@@ -374,7 +374,7 @@ async def get_control(control_id: str):
             detail=f"Control '{control_id}' not found"
         )
 
-    return JSONResponse(content=control)
+    return ORJSONResponse(content=control)
 
 
 @router.get("/search", response_model=List[Control])
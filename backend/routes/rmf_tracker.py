@@ -6,8 +6,9 @@ managing checklists, and handling artifact uploads.
 """
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from typing import List, Dict, Any, Optional
+import copy
 import logging
 import os
 import json
@@ -16,9 +17,9 @@ from datetime import datetime
 from pathlib import Path
 
 from data.rmf_stages import (
-    get_all_rmf_stages, get_rmf_stage, get_rmf_stage_checklist,
-    get_rmf_progress_summary, update_task_status,
-    RMF_TASK_STATUSES, RMF_TASK_PRIORITIES, RMF_ARTIFACT_TYPES
+    get_all_rmf_stages, get_all_rmf_stages_json, get_rmf_stage, get_rmf_stage_checklist,
+    get_rmf_progress_summary, get_rmf_total_hours, update_task_status, invalidate_rmf_state_caches,
+    RMF_TASK_STATUSES, RMF_TASK_STATUS_SET, RMF_TASK_PRIORITIES, RMF_ARTIFACT_TYPES
 )
 
 # Configure logging
@@ -34,6 +35,9 @@ ARTIFACTS_DIR.mkdir(exist_ok=True)
 # In-memory storage for RMF tracker state (in production, use database)
 rmf_tracker_state = {}
 
+# Response envelope wrapped around the pre-encoded stages JSON
+_STAGES_RESPONSE_PREFIX = b'{"success":true,"message":"RMF stages retrieved successfully","data":'
+
 @router.get("/stages")
 async def get_rmf_stages():
     """Get all RMF stages with their checklists and current status"""
@@ -41,6 +45,7 @@ async def get_rmf_stages():
         stages = get_all_rmf_stages()
         
         # Merge with any saved state
+        state_changed = False
         for stage_id, stage_data in stages.items():
             if stage_id in rmf_tracker_state:
                 # Update checklist items with saved state
@@ -49,13 +54,19 @@ async def get_rmf_stages():
                     task_id = task['id']
                     if task_id in saved_stage.get('tasks', {}):
                         saved_task = saved_stage['tasks'][task_id]
-                        task.update(saved_task)
+                        if any(task.get(key) != value for key, value in saved_task.items()):
+                            # Copy so later in-place edits to saved state still register as changes
+                            task.update(copy.deepcopy(saved_task))
+                            state_changed = True
         
-        return {
-            "success": True,
-            "message": "RMF stages retrieved successfully",
-            "data": stages
-        }
+        if state_changed:
+            invalidate_rmf_state_caches()
+        
+        # Stages JSON is cached until task state changes, so only the envelope is built here
+        return Response(
+            content=_STAGES_RESPONSE_PREFIX + get_all_rmf_stages_json() + b"}",
+            media_type="application/json"
+        )
         
     except Exception as e:
         logger.error(f"Failed to get RMF stages: {e}")
@@ -76,7 +87,9 @@ async def get_rmf_stage_details(stage_id: str):
                 task_id = task['id']
                 if task_id in saved_stage.get('tasks', {}):
                     saved_task = saved_stage['tasks'][task_id]
-                    task.update(saved_task)
+                    if any(task.get(key) != value for key, value in saved_task.items()):
+                        task.update(copy.deepcopy(saved_task))
+                        invalidate_rmf_state_caches()
         
         return {
             "success": True,
@@ -163,7 +176,7 @@ async def update_task_status_endpoint(
     """Update the status of a specific RMF task"""
     try:
         # Validate status
-        if status not in RMF_TASK_STATUSES:
+        if status not in RMF_TASK_STATUS_SET:
             raise HTTPException(
                 status_code=400, 
                 detail=f"Invalid status. Must be one of: {', '.join(RMF_TASK_STATUSES)}"
@@ -195,6 +208,7 @@ async def update_task_status_endpoint(
             'last_updated': datetime.now().isoformat(),
             'updated_by': 'current_user'  # In production, get from auth context
         }
+        invalidate_rmf_state_caches()
         
         logger.info(f"Updated task {task_id} in stage {stage_id} to status {status}")
         
@@ -270,6 +284,7 @@ async def upload_task_artifact(
         # Auto-update task status if artifact was required
         if rmf_tracker_state[stage_id]['tasks'][task_id].get('status', 'not_started') == 'not_started':
             rmf_tracker_state[stage_id]['tasks'][task_id]['status'] = 'in_progress'
+        invalidate_rmf_state_caches()
         
         logger.info(f"Uploaded artifact for task {task_id} in stage {stage_id}: {file.filename}")
         
@@ -359,6 +374,7 @@ async def delete_artifact(artifact_id: str):
                         
                         # Remove from state
                         artifacts.pop(i)
+                        invalidate_rmf_state_caches()
                         
                         logger.info(f"Deleted artifact {artifact_id}")
                         
@@ -390,7 +406,7 @@ async def get_rmf_tracker_statistics():
             'blocked_tasks': 0,
             'total_artifacts': 0,
             'tasks_by_priority': {'high': 0, 'medium': 0, 'low': 0, 'critical': 0},
-            'estimated_hours_total': 0,
+            'estimated_hours_total': get_rmf_total_hours(),
             'estimated_hours_remaining': 0,
             'stage_completion': {}
         }
@@ -408,9 +424,7 @@ async def get_rmf_tracker_statistics():
                 priority = task.get('priority', 'medium')
                 stats['tasks_by_priority'][priority] += 1
                 
-                # Add estimated hours
                 estimated_hours = task.get('estimated_hours', 0)
-                stats['estimated_hours_total'] += estimated_hours
                 
                 # Check saved state for actual status
                 task_status = 'not_started'
@@ -489,6 +503,7 @@ async def import_rmf_tracker_data(data: Dict[str, Any]):
             # Validate and import tracker state
             global rmf_tracker_state
             rmf_tracker_state = data['tracker_state']
+            invalidate_rmf_state_caches()
             
             logger.info("RMF tracker data imported successfully")
             
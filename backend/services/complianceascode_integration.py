@@ -18,17 +18,29 @@ Component: Phase 3 - ComplianceAsCode Integration
 import os
 import yaml
 import re
+import hashlib
 import logging
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple, Iterator
 from pathlib import Path
 from dataclasses import dataclass
 import subprocess
+from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import orjson
+
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Prefer the libyaml-backed loader; CaC rule trees hold thousands of YAML files
+try:
+    from yaml import CSafeLoader as YAMLSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLSafeLoader
+    logger.warning("libyaml not available - falling back to pure-Python YAML loader")
+
 
 @dataclass
 class CaCContentInfo:
@@ -66,6 +78,25 @@ class ComplianceAsCodeIntegration:
         "shared/rules",
     ]
 
+    # Rule subdirectories that hold tests and remediations, never rule definitions
+    RULE_INDEX_SKIP_DIRS = frozenset({
+        "tests", "oval", "ansible", "bash", "puppet", "kickstart", "blueprint",
+    })
+
+    # Maximum number of rules reported per control
+    MAX_RULES_PER_CONTROL = 10
+
+    # On-disk cache of parsed rule fields, keyed by each file's mtime and size
+    RULE_CACHE_DIR = Path("cache") / "cac_rules"
+    RULE_CACHE_VERSION = 3
+
+    # Remediation formats and the file extension used for each
+    REMEDIATION_EXTENSIONS = {
+        "ansible": ".yml",
+        "bash": ".sh",
+        "puppet": ".pp",
+    }
+
     # Platform-specific paths within CaC
     PLATFORM_PATHS = {
         "rhel8": "products/rhel8",
@@ -86,6 +117,8 @@ class ComplianceAsCodeIntegration:
         self.cac_repo_path = self._locate_cac_repo(cac_repo_path)
         self.auto_clone = auto_clone
         self.cache = {}  # In-memory cache
+        self._rule_index: Dict[Path, Tuple[List[str], List[str]]] = {}  # Rule columns per search root
+        self._rule_template_cache: Dict[str, List[str]] = {}  # Template names per rule
 
         if self.cac_repo_path:
             logger.info(f"ComplianceAsCode content found at: {self.cac_repo_path}")
@@ -264,7 +297,8 @@ class ComplianceAsCodeIntegration:
         if not self.cac_repo_path:
             return []
 
-        rule_ids = []
+        # Insertion-ordered set: the same rule ID can appear under several directories
+        rule_ids: Dict[str, None] = {}
 
         try:
             # Search in product-specific profiles
@@ -272,60 +306,225 @@ class ComplianceAsCodeIntegration:
             if not platform_path.exists():
                 platform_path = self.cac_repo_path / "linux_os"
 
-            # Search YAML files for control references
-            for yaml_file in platform_path.rglob("*.yml"):
-                try:
-                    with open(yaml_file, 'r', encoding='utf-8') as f:
-                        content = yaml.safe_load(f)
-
-                    # Check if control is referenced
-                    if self._yaml_contains_control(content, control_id):
-                        # Extract rule ID from filename or content
-                        rule_id = yaml_file.stem
-                        rule_ids.append(rule_id)
-
-                except Exception as e:
-                    logger.debug(f"Error parsing {yaml_file}: {e}")
-                    continue
+            # Search indexed rule text for control references
+            rule_names, search_texts = self._get_rule_index(platform_path)
+            for i, search_text in enumerate(search_texts):
+                if control_id in search_text:
+                    rule_ids[rule_names[i]] = None
+                    if len(rule_ids) >= self.MAX_RULES_PER_CONTROL:
+                        break
 
         except Exception as e:
             logger.error(f"Error searching CaC rules: {e}")
 
-        return rule_ids[:10]  # Limit to 10 rules
+        return list(rule_ids)
 
-    def _yaml_contains_control(self, yaml_content: Any, control_id: str) -> bool:
+    def _get_rule_index(self, search_root: Path) -> Tuple[List[str], List[str]]:
         """
-        Check if YAML content references NIST control.
+        Get the rule index for all YAML files under a search root.
+
+        The tree is walked and parsed once per root; later control searches
+        only scan the cached columns. Rule IDs and search text are kept in
+        parallel lists so a search touches the ID only on a match.
 
         Args:
-            yaml_content: Parsed YAML content
-            control_id: NIST control ID
+            search_root: Directory to index
 
         Returns:
-            True if control referenced
+            (rule IDs, rule search texts) as parallel lists
         """
-        if not isinstance(yaml_content, dict):
-            return False
+        if search_root in self._rule_index:
+            return self._rule_index[search_root]
+
+        cache_file = self._get_rule_cache_file(search_root)
+        cached = self._load_rule_cache(cache_file)
+        entries = {}
+        stale = []
+
+        # Reuse cached entries for files whose mtime and size are unchanged
+        for yaml_file in self._walk_yaml_files(str(search_root)):
+            try:
+                stat = os.stat(yaml_file)
+            except OSError:
+                continue
+
+            signature = [stat.st_mtime_ns, stat.st_size]
+            entry = cached.get(yaml_file)
+            if entry is not None and entry[:2] == signature:
+                entries[yaml_file] = entry
+            else:
+                entries[yaml_file] = None  # Filled in below; keeps walk order
+                stale.append((yaml_file, signature))
+
+        # Only new or modified files are parsed; reads overlap across threads
+        if stale:
+            with ThreadPoolExecutor() as executor:
+                parsed = executor.map(self._load_yaml_file, [yaml_file for yaml_file, _ in stale])
+
+                for (yaml_file, signature), content in zip(stale, parsed):
+                    entries[yaml_file] = signature + [self._extract_rule_entry(yaml_file, content)]
+
+        if stale or len(entries) != len(cached):
+            self._save_rule_cache(cache_file, entries)
+
+        rule_names = []
+        search_texts = []
+        for entry in entries.values():
+            if entry[2] is not None:
+                rule_names.append(entry[2][0])
+                search_texts.append(entry[2][1])
+        index = (rule_names, search_texts)
+
+        logger.debug(f"Indexed {len(rule_names)} CaC YAML files under {search_root}")
+        self._rule_index[search_root] = index
+        return index
+
+    def _extract_rule_entry(self, yaml_file: str, content: Any) -> Optional[List[str]]:
+        """
+        Extract the rule ID and search text from parsed YAML content.
+
+        Args:
+            yaml_file: Path to YAML file
+            content: Parsed YAML content
+
+        Returns:
+            [rule ID, rule search text], or None if the file is not a mapping
+        """
+        if not isinstance(content, dict):
+            return None
+
+        # CaC rules live in <rule_id>/rule.yml; other files are named after their ID
+        parent, filename = os.path.split(yaml_file)
+        if filename == "rule.yml":
+            rule_id = os.path.basename(parent)
+        else:
+            rule_id = os.path.splitext(filename)[0]
+
+        return [rule_id, self._rule_search_text(content)]
+
+    def _get_rule_cache_file(self, search_root: Path) -> Path:
+        """Get the on-disk rule cache file for a search root."""
+        cache_key = hashlib.sha256(str(search_root.resolve()).encode()).hexdigest()[:16]
+        return self.RULE_CACHE_DIR / f"{cache_key}.json"
+
+    def _load_rule_cache(self, cache_file: Path) -> Dict[str, List[Any]]:
+        """
+        Load cached rule entries from disk.
+
+        Args:
+            cache_file: Rule cache file
+
+        Returns:
+            Dict mapping file path to [mtime_ns, size, rule entry]; empty if
+            the cache is missing, unreadable or from another cache version
+        """
+        if not cache_file.exists():
+            return {}
+
+        try:
+            cache_data = orjson.loads(cache_file.read_bytes())
+        except (OSError, orjson.JSONDecodeError) as e:  # Truncated caches just mean a rebuild
+            logger.debug(f"Ignoring unreadable CaC rule cache {cache_file}: {e}")
+            return {}
+
+        if not isinstance(cache_data, dict) or cache_data.get("version") != self.RULE_CACHE_VERSION:
+            return {}
+        return cache_data.get("files", {})
 
-        # Check common fields
+    def _save_rule_cache(self, cache_file: Path, entries: Dict[str, List[Any]]) -> None:
+        """
+        Write rule entries to the on-disk cache.
+
+        Args:
+            cache_file: Rule cache file
+            entries: Dict mapping file path to [mtime_ns, size, rule entry]
+        """
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            temp_file.write_bytes(orjson.dumps({"version": self.RULE_CACHE_VERSION, "files": entries}))
+            os.replace(temp_file, cache_file)
+        except (OSError, orjson.JSONEncodeError) as e:
+            logger.warning(f"Failed to write CaC rule cache {cache_file}: {e}")
+
+    def _walk_yaml_files(self, root: str) -> Iterator[str]:
+        """
+        Yield paths of YAML files under a directory, for rule indexing.
+
+        Uses os.scandir directly rather than Path.rglob, avoiding a Path
+        object per directory entry on large CaC trees. Like rglob, symlinked
+        directories are not descended into. Subtrees named in
+        RULE_INDEX_SKIP_DIRS are pruned.
+
+        Args:
+            root: Directory to walk
+
+        Yields:
+            YAML file paths as strings
+        """
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in self.RULE_INDEX_SKIP_DIRS:
+                                stack.append(entry.path)
+                        elif entry.name.endswith(".yml"):
+                            yield entry.path
+            except OSError as e:
+                logger.debug(f"Error scanning {directory}: {e}")
+
+    def _load_yaml_file(self, yaml_file: str) -> Any:
+        """
+        Parse a single YAML file.
+
+        Args:
+            yaml_file: Path to YAML file
+
+        Returns:
+            Parsed YAML content, or None if the file cannot be parsed
+        """
+        try:
+            # Binary stream: the loader detects the encoding and decodes in C
+            with open(yaml_file, 'rb') as f:
+                return yaml.load(f, Loader=YAMLSafeLoader)
+        except Exception as e:
+            logger.debug(f"Error parsing {yaml_file}: {e}")
+            return None
+
+    def _rule_search_text(self, yaml_content: Dict[str, Any]) -> str:
+        """
+        Build the text searched for NIST control references.
+
+        A control matches when its ID appears in any of the NIST references,
+        identifiers, title or description. The fields are joined with
+        newlines, which never occur in a normalized control ID, so a single
+        substring test is equivalent to testing each field.
+
+        Args:
+            yaml_content: Parsed YAML mapping
+
+        Returns:
+            Newline-joined searchable fields
+        """
+        fields = []
+
+        # NIST references
         references = yaml_content.get("references", {})
         if isinstance(references, dict):
             nist_refs = references.get("nist", []) or references.get("nist-csf", [])
-            if control_id in str(nist_refs):
-                return True
+            fields.append(str(nist_refs))
 
-        # Check identifiers
-        identifiers = yaml_content.get("identifiers", {})
-        if control_id in str(identifiers):
-            return True
+        # Identifiers
+        fields.append(str(yaml_content.get("identifiers", {})))
 
-        # Check title/description
-        title = yaml_content.get("title", "")
-        description = yaml_content.get("description", "")
-        if control_id in title or control_id in description:
-            return True
+        # Title/description
+        fields.append(str(yaml_content.get("title") or ""))
+        fields.append(str(yaml_content.get("description") or ""))
 
-        return False
+        return "\n".join(fields)
 
     def _get_rule_templates(self, rule_id: str) -> List[str]:
         """
@@ -340,6 +539,10 @@ class ComplianceAsCodeIntegration:
         if not self.cac_repo_path:
             return []
 
+        # Rules recur across controls; each rule's templates are globbed once
+        if rule_id in self._rule_template_cache:
+            return self._rule_template_cache[rule_id]
+
         templates = []
 
         # Search for template files
@@ -352,6 +555,7 @@ class ComplianceAsCodeIntegration:
             for template_file in self.cac_repo_path.glob(pattern):
                 templates.append(template_file.stem)
 
+        self._rule_template_cache[rule_id] = templates
         return templates
 
     def _check_remediation_availability(self, rule_id: str) -> Dict[str, bool]:
@@ -369,19 +573,46 @@ class ComplianceAsCodeIntegration:
         if not self.cac_repo_path:
             return availability
 
-        # Search for remediation files
-        remediation_patterns = {
-            "ansible": f"**/ansible/{rule_id}.yml",
-            "bash": f"**/bash/{rule_id}.sh",
-            "puppet": f"**/puppet/{rule_id}.pp",
-        }
-
-        for format, pattern in remediation_patterns.items():
-            matches = list(self.cac_repo_path.glob(pattern))
-            availability[format] = len(matches) > 0
+        # One lookup per format in the prebuilt index instead of a '**' glob each
+        remediation_index = self._remediation_index
+        for format in availability:
+            availability[format] = (format, rule_id) in remediation_index
 
         return availability
 
+    @cached_property
+    def _remediation_index(self) -> Dict[Tuple[str, str], str]:
+        """
+        Remediation file paths keyed by (format, rule ID).
+
+        Built on first access from a single os.scandir walk of the
+        repository, replacing a recursive glob per rule and format. A file
+        <format>/<rule_id><ext> anywhere in the tree is indexed, matching
+        the previous "**/<format>/<rule_id><ext>" patterns.
+
+        Returns:
+            Dict mapping (format, rule ID) to remediation file path
+        """
+        index = {}
+        stack = [str(self.cac_repo_path)]
+        while stack:
+            directory = stack.pop()
+            format = os.path.basename(directory)
+            ext = self.REMEDIATION_EXTENSIONS.get(format)
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name != ".git":
+                                stack.append(entry.path)
+                        elif ext and entry.name.endswith(ext):
+                            index.setdefault((format, entry.name[:-len(ext)]), entry.path)
+            except OSError as e:
+                logger.debug(f"Error scanning {directory}: {e}")
+
+        logger.debug(f"Indexed {len(index)} CaC remediation files")
+        return index
+
     def extract_cac_template(self, rule_id: str) -> Optional[str]:
         """
         Extract Jinja2 template content from CaC.
@@ -461,14 +692,12 @@ class ComplianceAsCodeIntegration:
         if not self.cac_repo_path:
             return None
 
-        extensions = {
-            "ansible": ".yml",
-            "bash": ".sh",
-            "puppet": ".pp",
-        }
+        if format in self.REMEDIATION_EXTENSIONS:
+            remediation_path = self._remediation_index.get((format, rule_id))
+            return Path(remediation_path) if remediation_path else None
 
-        ext = extensions.get(format, ".yml")
-        pattern = f"**/{format}/{rule_id}{ext}"
+        # Formats outside the index fall back to a tree search
+        pattern = f"**/{format}/{rule_id}.yml"
 
         matches = list(self.cac_repo_path.glob(pattern))
         return matches[0] if matches else None